@@ -1,25 +1,91 @@
 import argparse
+import importlib
 import json
 import logging
 import pathlib
 import os
-try:
-    from importlib.metadata import version
-except ImportError:
-    from importlib_metadata import version
+import itertools
+from typing import Optional, Set
 
-from . import parser
-from . import generator
+# parser, generator and the optional json libraries are imported where they are
+# used, so that --help and --version return without loading pydantic and lkml
 
 MANIFEST_PATH = './manifest.json'
 DEFAULT_LOOKML_OUTPUT_DIR = '.'
+# Below this many models, forking worker processes costs more than it saves
+PARALLEL_MODEL_THRESHOLD = 8
+# Threads used to write view files, writes release the GIL while blocked on disk
+WRITE_WORKERS = 4
 
 
-def get_manifest(prefix: str):
+def optional_import(name: str):
+    ''' Import an optional dependency, returning None if it is not installed '''
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def load_json(path: str):
+    ''' Load a json file in full, using orjson if it is installed '''
+    orjson = optional_import('orjson')
+    if orjson is not None:
+        # hand orjson the raw bytes, it decodes utf-8 itself
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def use_streaming(tag: Optional[str] = None, select_model: Optional[str] = None, legacy_parser: bool = False) -> bool:
+    ''' Stream the dbt artifacts only when filtering models, where it keeps memory down.
+        Without a filter everything is kept anyway, and a full load is faster.
+    '''
+    if legacy_parser or (tag is None and select_model is None):
+        return False
+    return optional_import('ijson') is not None
+
+
+def stream_manifest(manifest_path: str, tag: Optional[str] = None, select_model: Optional[str] = None, exposures: bool = True):
+    ''' Stream the parts of manifest.json we use, keeping only the models matching the filters
+        exposures are read in a second pass over the file, so they are skipped when not needed
+    '''
+    import ijson
+    from . import parser
+    with open(manifest_path, 'rb') as f:
+        raw_manifest = {'metadata': next(ijson.items(f, 'metadata', use_float=True), {})}
+        f.seek(0)
+        node_matches = parser.raw_node_filter(tag=tag, select_model=select_model)
+        raw_manifest['nodes'] = {
+            unique_id: node
+            for unique_id, node in ijson.kvitems(f, 'nodes', use_float=True)
+            if node_matches(node)
+        }
+        raw_manifest['exposures'] = {}
+        if exposures:
+            f.seek(0)
+            raw_manifest['exposures'] = dict(ijson.kvitems(f, 'exposures', use_float=True))
+    return raw_manifest
+
+
+def stream_catalog(catalog_path: str, node_ids: Optional[Set[str]] = None):
+    ''' Stream the nodes of catalog.json, skipping sources and stats, and nodes not in node_ids if given '''
+    import ijson
+    with open(catalog_path, 'rb') as f:
+        return {'nodes': {
+            unique_id: node
+            for unique_id, node in ijson.kvitems(f, 'nodes', use_float=True)
+            if node_ids is None or unique_id in node_ids
+        }}
+
+
+def get_manifest(prefix: str, tag: Optional[str] = None, select_model: Optional[str] = None, legacy_parser: bool = False, exposures_only: bool = False):
     manifest_path = os.path.join(prefix, 'manifest.json')
     try:
-        with open(manifest_path, 'r') as f:
-            raw_manifest = json.load(f)
+        if use_streaming(tag=tag, select_model=select_model, legacy_parser=legacy_parser):
+            raw_manifest = stream_manifest(manifest_path, tag=tag, select_model=select_model, exposures=exposures_only)
+        else:
+            raw_manifest = load_json(manifest_path)
     except FileNotFoundError as e:
         logging.error(f'Could not find manifest file at {manifest_path}. Use --target-dir to change the search path for the manifest.json file.')
         raise SystemExit('Failed')
@@ -27,23 +93,121 @@ def get_manifest(prefix: str):
     return raw_manifest
 
 
-def get_catalog(prefix: str):
+def get_catalog(prefix: str, node_ids: Optional[Set[str]] = None):
+    ''' Load catalog.json, streaming only the nodes in node_ids when given '''
     catalog_path = os.path.join(prefix, 'catalog.json')
     try:
-        with open(catalog_path, 'r') as f:
-            raw_catalog = json.load(f)
+        if node_ids is not None:
+            raw_catalog = stream_catalog(catalog_path, node_ids=node_ids)
+        else:
+            raw_catalog = load_json(catalog_path)
     except FileNotFoundError as e:
         logging.error(f'Could not find catalog file at {catalog_path}. Use --target-dir to change the search path for the catalog.json file.')
         raise SystemExit('Failed')
     logging.debug(f'Detected catalog at {catalog_path}')
     return raw_catalog
 
+def generate_lookml_views(dbt_models: list, adapter_type: str, strict: bool = False, log_level: str = 'INFO', jobs: Optional[int] = None):
+    ''' Generate lookml views for models, spread over worker processes for larger projects
+        jobs caps the worker processes and defaults to the cpu count, 1 generates every view inline
+        log_level is applied in each worker, as spawned workers do not inherit the logging setup
+    '''
+    from . import generator
+    workers = min(jobs or os.cpu_count() or 1, len(dbt_models))
+    if len(dbt_models) > PARALLEL_MODEL_THRESHOLD and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=configure_logging, initargs=(log_level,)) as executor:
+                lookml_views = list(executor.map(
+                    generator.lookml_view_from_dbt_model,
+                    dbt_models,
+                    itertools.repeat(adapter_type),
+                    itertools.repeat(strict),
+                ))
+            return [view for view in lookml_views if view is not None]
+        # the pool cannot start in daemonic processes, without working semaphores
+        # (no /dev/shm) or when its workers are killed, so generate inline instead
+        except (AssertionError, NotImplementedError, OSError, BrokenProcessPool) as e:
+            logging.warning(f'Could not generate views in worker processes, generating them inline: {e}')
+    lookml_views = [generator.lookml_view_from_dbt_model(model, adapter_type, strict=strict) for model in dbt_models]
+    return [view for view in lookml_views if view is not None]
+
+def write_lookml_file(path: str, contents: str):
+    ''' Write a lookml file, handing the whole payload to a single write call '''
+    data = memoryview(contents.encode('utf-8'))
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def write_lookml_views(lookml_views: list, output_dir: str, remove_schema_string: Optional[str] = None):
+    ''' Write views to <output_dir>/views/<schema>/, creating each schema directory once '''
+    views_dir = os.path.join(output_dir, 'views')
+    for view in lookml_views:
+        # handle schema name
+        if remove_schema_string:
+            view.db_schema = view.db_schema.replace(remove_schema_string, '')
+
+    # several views can share a path (versioned models, or schemas merged by
+    # remove_schema_string), give each path one write so the last view wins as
+    # it would when writing in order, rather than racing in the pool
+    contents_by_path = {}
+    for view in lookml_views:
+        path = os.path.join(views_dir, view.db_schema, view.filename)
+        if path in contents_by_path:
+            logging.warning(f'More than one view is written to {path}, keeping the last one')
+        contents_by_path[path] = view.contents
+
+    pathlib.Path(views_dir).mkdir(exist_ok=True, parents=True)
+    for db_schema in {view.db_schema for view in lookml_views}:
+        pathlib.Path(views_dir, db_schema).mkdir(exist_ok=True, parents=True)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+        futures = [
+            executor.submit(write_lookml_file, path, contents)
+            for path, contents in contents_by_path.items()
+        ]
+        # surface the first failed write
+        for future in futures:
+            future.result()
+
+def positive_int(value: str) -> int:
+    ''' An argparse type for counts that must be at least 1 '''
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive integer')
+    return number
+
+class VersionAction(argparse.Action):
+    ''' Print the installed version, looking it up only when --version is given '''
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            from importlib.metadata import version
+        except ImportError:
+            from importlib_metadata import version
+        print(f'dbt2looker {version("dbt2looker_bigquery")}')
+        parser.exit()
+
+def configure_logging(log_level: str):
+    logging.basicConfig(
+        level=getattr(logging, log_level),
+        format='%(asctime)s %(levelname)-6s %(message)s',
+        datefmt='%H:%M:%S',
+    )
+
 def run():
     argparser = argparse.ArgumentParser()
     argparser.add_argument(
         '--version',
-        action='version',
-        version=f'dbt2looker {version("dbt2looker_bigquery")}',
+        action=VersionAction,
+        help="show program's version number and exit",
     )
     argparser.add_argument(
         '--target-dir',
@@ -89,35 +253,40 @@ def run():
         help='select a specific model to generate lookml for',
         type=str
     )
-    args = argparser.parse_args()
-    logging.basicConfig(
-        level=getattr(logging, args.log_level),
-        format='%(asctime)s %(levelname)-6s %(message)s',
-        datefmt='%H:%M:%S',
+    argparser.add_argument(
+        '--legacy-parser',
+        help='load manifest.json and catalog.json in full instead of streaming them with ijson when filtering with --tag or --select',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--strict',
+        help='serialize views with lkml.dump instead of the built-in lookml writer',
+        action='store_true',
     )
+    argparser.add_argument(
+        '--jobs',
+        help='number of worker processes used to generate views. Default is the number of cpus, 1 generates them in this process',
+        type=positive_int,
+    )
+    args = argparser.parse_args()
+    configure_logging(args.log_level)
+    from . import parser
 
     # Load raw manifest file
-    raw_manifest = get_manifest(prefix=args.target_dir)
-    raw_catalog = get_catalog(prefix=args.target_dir)
+    raw_manifest = get_manifest(prefix=args.target_dir, tag=args.tag, select_model=args.select, legacy_parser=args.legacy_parser, exposures_only=args.exposures_only)
+    # a streamed manifest only holds the selected models, so only their catalog entries are needed
+    node_ids = None
+    if use_streaming(tag=args.tag, select_model=args.select, legacy_parser=args.legacy_parser):
+        node_ids = set(raw_manifest['nodes'])
+    raw_catalog = get_catalog(prefix=args.target_dir, node_ids=node_ids)
     # Get dbt models from manifest
     typed_dbt_models = parser.parse_typed_models(raw_manifest, raw_catalog, tag=args.tag, exposures_only=args.exposures_only, select_model=args.select)
 
     adapter_type = parser.parse_adapter_type(raw_manifest)
     
     # Generate lookml views
-    lookml_views = [
-        generator.lookml_view_from_dbt_model(model, adapter_type)
-        for model in typed_dbt_models
-        if generator.lookml_view_from_dbt_model(model, adapter_type) is not None
-    ]
-    pathlib.Path(os.path.join(args.output_dir, 'views')).mkdir(exist_ok=True, parents=True)
-    for view in lookml_views:
-        # handle schema name
-        if args.remove_schema_string:
-            view.db_schema = view.db_schema.replace(args.remove_schema_string, '')
-        pathlib.Path(os.path.join(args.output_dir, 'views', view.db_schema)).mkdir(exist_ok=True, parents=True)
-        with open(os.path.join(args.output_dir, 'views', view.db_schema, view.filename), 'w') as f:
-            f.write(view.contents)
+    lookml_views = generate_lookml_views(typed_dbt_models, adapter_type, strict=args.strict, log_level=args.log_level, jobs=args.jobs)
+    write_lookml_views(lookml_views, args.output_dir, remove_schema_string=args.remove_schema_string)
 
     logging.info(f'Generated {len(lookml_views)} lookml views in {os.path.join(args.output_dir, "views")}')
 
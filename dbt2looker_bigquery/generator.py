@@ -1,6 +1,9 @@
+import functools
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 import lkml
 from . import models
-from rich import print
+from . import lkml_fast
 import logging
 
 class NotImplementedError(Exception):
@@ -28,7 +31,7 @@ LOOKER_DTYPE_MAP = {
     }
 }
 
-LOOKER_BIGQUERY_MEASURE_TYPES = [
+LOOKER_BIGQUERY_MEASURE_TYPES = frozenset([
     'count',
     'count_distinct',
     'sum',
@@ -45,11 +48,11 @@ LOOKER_BIGQUERY_MEASURE_TYPES = [
     'var_pop',
     'var_samp',
     'sum_distinct',
-]
+])
 
-looker_date_time_types = ['datetime', 'timestamp']
-looker_date_types = ['date']
-looker_scalar_types = ['number', 'yesno', 'string']
+looker_date_time_types = frozenset(['datetime', 'timestamp'])
+looker_date_types = frozenset(['date'])
+looker_scalar_types = frozenset(['number', 'yesno', 'string'])
 
 looker_date_timeframes = [
     'date',
@@ -72,21 +75,23 @@ looker_time_timeframes = [
     'time_of_day',
 ]
 
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+
+@functools.lru_cache(maxsize=4096)
+def to_label(name: str) -> str:
+    ''' Turn a snake_case name into a title case label, e.g. order_items -> Order Items '''
+    return name.translate(_UNDERSCORE_TO_SPACE).title()
+
 def validate_sql(sql: str):
     ''' Validate that a string is a valid Looker SQL expression '''
-    def check_if_has_dollar_syntax(sql):
-        ''' check if the string either has ${TABLE}.example or ${view_name} '''
-        return '${' in sql and '}' in sql
-    
-    def check_expression_has_ending_semicolons(sql):
-        ''' check if the string ends with a semicolon '''
-        return sql.strip().endswith(';;')
-
-    if check_expression_has_ending_semicolons(sql):
+    stripped = sql.strip()
+    if stripped.endswith(';;'):
         logging.warn(f"SQL expression {sql} ends with semicolons. It is removed and added by lkml.")
-        sql = sql.strip().rstrip(';').rstrip(';')
+        sql = stripped.rstrip(';')
 
-    if not check_if_has_dollar_syntax(sql):
+    # the string should either have ${TABLE}.example or ${view_name}
+    dollar = sql.find('${')
+    if dollar < 0 or sql.find('}', dollar + 2) < 0:
         logging.warn(f"SQL expression {sql} does not contain $TABLE or $view_name")
         return None
     else:
@@ -117,13 +122,13 @@ def lookml_dimension_group(column: models.DbtModelColumn, adapter_type: models.S
         dimensions = []
         dimension_group = {
             'name': column.lookml_name,
-            'label': column.lookml_name.replace("_date","").replace("_", " ").title(),
+            'label': to_label(column.lookml_name.replace("_date","")),
             'type': 'time',
             'sql': f'${{TABLE}}.{column.name}' if table_format_sql else f'{model.name}__{column.name}',
             'description': column.description,
             'datatype': map_adapter_type_to_looker(adapter_type, column.data_type),
             'timeframes': timeframes,
-            'group_label': f'{column.lookml_name.replace("_", " ").title()}',
+            'group_label': to_label(column.lookml_name),
             'convert_tz': convert_tz
         }
         if column.meta.looker.label != None:
@@ -142,11 +147,11 @@ def lookml_dimension_group(column: models.DbtModelColumn, adapter_type: models.S
 
             iso_year = {
                 'name': f'{column.name}_iso_year',
-                'label': f'{column.name.replace("_date","").replace("_"," ").title()} ISO Year',
+                'label': f'{to_label(column.name.replace("_date",""))} ISO Year',
                 'type': 'number',
                 'sql': f'Extract(isoyear from ${{TABLE}}.{column.name})',
                 'description': f'iso year for {column.name}',
-                'group_label': f'{column.lookml_name.replace("_", " ").title()}',
+                'group_label': to_label(column.lookml_name),
                 'value_format_name': 'id'
             }
             if column.meta.looker.group_label != None:
@@ -156,11 +161,11 @@ def lookml_dimension_group(column: models.DbtModelColumn, adapter_type: models.S
 
             iso_week_of_year = {
                 'name': f'{column.name}_iso_week_of_year',
-                'label': f'{column.name.replace("_date","").replace("_"," ").title()} ISO Week Of Year',
+                'label': f'{to_label(column.name.replace("_date",""))} ISO Week Of Year',
                 'type': 'number',
                 'sql': f'Extract(isoweek from ${{TABLE}}.{column.name})',
                 'description': f'iso year for {column.name}',
-                'group_label': f'{column.lookml_name.replace("_", " ").title()}',
+                'group_label': to_label(column.lookml_name),
                 'value_format_name': 'id'
             }
             if column.meta.looker.group_label != None:
@@ -177,141 +182,160 @@ def lookml_dimension_group(column: models.DbtModelColumn, adapter_type: models.S
         return dimension_group, dimension_group_set, dimensions
 
 
-def lookml_dimension_groups_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, include_names=None, exclude_names=[]):
-
-    dimension_groups = []
-    dimension_group_sets = []
-    table_format_sql = True
+@dataclass
+class ColumnBuckets:
+    ''' The columns of one view, sorted by the lookml they produce.
+        Built in a single pass by bucket_columns and shared by the dimension,
+        dimension group and measure builders.
+    '''
+    table_format_sql: bool = True
+    # (column, looker type) for scalar dimensions and the extra dimensions of dates, in column order
+    dimensions: List[Tuple[models.DbtModelColumn, str]] = field(default_factory=list)
+    # (column, looker type) for date and time dimension groups
+    dimension_groups: List[Tuple[models.DbtModelColumn, str]] = field(default_factory=list)
+    # scalar columns that may carry looker measures
+    measures: List[models.DbtModelColumn] = field(default_factory=list)
+    primary_key: Optional[models.DbtModelColumn] = None
+
+def bucket_columns(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, include_names=None, exclude_names=()) -> ColumnBuckets:
+    ''' Sort the columns of a model into ColumnBuckets for a single view
+        include_names restricts the view to those columns, as for nested array views
+        exclude_names drops columns already used by nested array views
+    '''
+    buckets = ColumnBuckets(table_format_sql=not include_names)
+    is_first_dimension = True  # Flag to identify the first dimension
 
-    for column in model.columns.values(): 
+    for column in model.columns.values():
+        name = column.name
+        inner_types = column.inner_types
 
         if include_names:
-            table_format_sql = False
-            if column.inner_types is not None:
-                if len(column.inner_types) == 1:
-                    column.data_type = column.inner_types[0]
-            if column.name not in include_names:
-                continue
-        if len(exclude_names) > 0:
-            if column.name in exclude_names:
+            if inner_types is not None:
+                if len(inner_types) == 1:
+                    column.data_type = inner_types[0]
+                    is_first_dimension = False
+            if name not in include_names:
                 continue
 
-        if map_adapter_type_to_looker(adapter_type, column.data_type) in looker_date_time_types: 
-            dimension_group, dimension_set, _ = lookml_dimension_group(column, adapter_type, 'time', table_format_sql, model)            
-        elif map_adapter_type_to_looker(adapter_type, column.data_type) in looker_date_types:
-            dimension_group, dimension_set, _ = lookml_dimension_group(column, adapter_type, 'date', table_format_sql, model)            
-        else:
+        excluded = name in exclude_names
+        # we want to exclude nested data within arrays
+        # but we want to retain the array itself
+        dimension_excluded = excluded and inner_types is not None and len(inner_types) != 1
+        if dimension_excluded:
+            logging.debug('excluding %s', name)
+
+        looker_type = map_adapter_type_to_looker(adapter_type, column.data_type)
+
+        if not dimension_excluded:
+            if looker_type in looker_scalar_types:
+                if is_first_dimension:
+                    buckets.primary_key = column
+                    is_first_dimension = False  # Unset the flag after processing the first dimension
+                buckets.dimensions.append((column, looker_type))
+            elif looker_type == 'date':
+                # We need to add dimensions for date types that are not handled by dimension groups.
+                buckets.dimensions.append((column, looker_type))
+
+        if excluded:
             continue
 
-        dimension_groups.append(dimension_group)
-        dimension_group_sets.append(dimension_set)
+        if looker_type in looker_date_time_types or looker_type in looker_date_types:
+            buckets.dimension_groups.append((column, looker_type))
+        elif looker_type in looker_scalar_types:
+            buckets.measures.append(column)
 
-    return {'dimension_groups' : dimension_groups, 'dimension_group_sets': dimension_group_sets}
+    return buckets
 
-def lookml_dimensions_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, include_names=None, exclude_names=[]):
-    dimensions = []
-    is_first_dimension = True  # Flag to identify the first dimension
-    table_format_sql = True
-    is_hidden = False
+def lookml_dimension_groups_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, include_names=None, exclude_names=(), buckets: Optional[ColumnBuckets] = None):
 
-    for column in model.columns.values():
+    if buckets is None:
+        buckets = bucket_columns(model, adapter_type, include_names, exclude_names)
 
-        if include_names:
-            table_format_sql = False
-            # logging.debug(column)
-            if column.inner_types is not None:
-                if len(column.inner_types) == 1:
-                    column.data_type = column.inner_types[0]
-                    is_first_dimension = False
+    dimension_groups = []
+    dimension_group_sets = []
 
-            if column.name not in include_names:
-                continue
+    for column, looker_type in buckets.dimension_groups:
+        group_type = 'time' if looker_type in looker_date_time_types else 'date'
+        dimension_group, dimension_set, _ = lookml_dimension_group(column, adapter_type, group_type, buckets.table_format_sql, model)
 
-        if len(exclude_names) > 0:
-            # we want to exclude nested data within arrays
-            # but we want to retain the array itself
-            if column.inner_types is not None:
-                if column.name in exclude_names and not (len(column.inner_types) == 1 and column.inner_types is not None):
-                    logging.debug(f"excluding {column.name}")
-                    continue
+        dimension_groups.append(dimension_group)
+        dimension_group_sets.append(dimension_set)
 
-        if map_adapter_type_to_looker(adapter_type, column.data_type) in looker_scalar_types:
+    return {'dimension_groups' : dimension_groups, 'dimension_group_sets': dimension_group_sets}
 
-            dimension = {
-                'name': column.lookml_long_name if table_format_sql else column.lookml_name,
-                'type': map_adapter_type_to_looker(adapter_type, column.data_type),
-                'sql': f'${{TABLE}}.{column.name}' if table_format_sql else f'{model.name}__{column.name}',
-                'description': column.description,
-            }
-            
-            if 'ARRAY' in column.data_type :
-                dimension['hidden'] = 'yes'
-                dimension['tags'] = ['array']
-                dimension.pop('type')
+def lookml_dimensions_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, include_names=None, exclude_names=(), buckets: Optional[ColumnBuckets] = None):
 
-            if 'STRUCT' in column.data_type :
-                dimension['hidden'] = 'yes'
-                dimension['tags'] = ['struct']
-                # dimension.pop('type')
-
-            if is_first_dimension == True:
-                dimension['primary_key'] = 'yes'
-                is_first_dimension = False  # Unset the flag after processing the first dimension
-                is_hidden = True
-                dimension['value_format_name'] = 'id'
-
-            if column.meta.looker is not None:
-                if column.meta.looker.group_label != None:
-                    dimension['group_label'] = column.meta.looker.group_label
-                if column.meta.looker.label  != None:
-                    dimension['label'] = column.meta.looker.label
-
-                if column.meta.looker.hidden != None:
-                    dimension['hidden'] = 'yes' if column.meta.looker.hidden == True else 'no'
-                elif is_hidden:
-                    dimension['hidden'] = 'yes'
-
-                if column.meta.looker.value_format_name != None:
-                    dimension['value_format_name'] = column.meta.looker.value_format_name.value
-        
-            is_hidden = False
-            dimensions.append(dimension)
+    if buckets is None:
+        buckets = bucket_columns(model, adapter_type, include_names, exclude_names)
+
+    dimensions = []
+    table_format_sql = buckets.table_format_sql
 
-        if map_adapter_type_to_looker(adapter_type, column.data_type) == 'date':
-            # We need to add dimensions for date types that are not handled by dimension groups.
+    for column, looker_type in buckets.dimensions:
+
+        if looker_type == 'date':
             # And we need to feed the lkml file with a group of dimensions
             _, _, dimension_group_dimensions = lookml_dimension_group(column, adapter_type, 'date', table_format_sql, model)
             if dimension_group_dimensions is None:
                 logging.warning(f"no dimensions for {column.name} {column.data_type} {table_format_sql} {model.name}__{column.name}")
             else:
                 dimensions.extend(dimension_group_dimensions)
+            continue
 
-    return dimensions
+        dimension = {
+            'name': column.lookml_long_name if table_format_sql else column.lookml_name,
+            'type': looker_type,
+            'sql': f'${{TABLE}}.{column.name}' if table_format_sql else f'{model.name}__{column.name}',
+            'description': column.description,
+        }
+        
+        if 'ARRAY' in column.data_type :
+            dimension['hidden'] = 'yes'
+            dimension['tags'] = ['array']
+            dimension.pop('type')
+
+        if 'STRUCT' in column.data_type :
+            dimension['hidden'] = 'yes'
+            dimension['tags'] = ['struct']
+            # dimension.pop('type')
+
+        is_primary_key = column is buckets.primary_key
+        if is_primary_key:
+            dimension['primary_key'] = 'yes'
+            dimension['value_format_name'] = 'id'
+
+        if column.meta.looker is not None:
+            if column.meta.looker.group_label != None:
+                dimension['group_label'] = column.meta.looker.group_label
+            if column.meta.looker.label  != None:
+                dimension['label'] = column.meta.looker.label
 
-def lookml_measures_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, include_names=None, exclude_names=[]):
-    # Initialize an empty list to hold all lookml measures.
-    lookml_measures = []
-    table_format_sql = True
+            if column.meta.looker.hidden != None:
+                dimension['hidden'] = 'yes' if column.meta.looker.hidden == True else 'no'
+            elif is_primary_key:
+                dimension['hidden'] = 'yes'
 
-    # Iterate over all columns in the model.
-    for column in model.columns.values():
-        
-        if include_names:
-            table_format_sql = False
-            if column.name not in include_names:
-                continue
-        if len(exclude_names) > 0:
+            if column.meta.looker.value_format_name != None:
+                dimension['value_format_name'] = column.meta.looker.value_format_name.value
+    
+        dimensions.append(dimension)
 
-            if column.name in exclude_names:
-                continue
+    return dimensions
+
+def lookml_measures_from_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, include_names=None, exclude_names=(), buckets: Optional[ColumnBuckets] = None):
 
-        if map_adapter_type_to_looker(adapter_type, column.data_type) in looker_scalar_types:
+    if buckets is None:
+        buckets = bucket_columns(model, adapter_type, include_names, exclude_names)
+
+    # Initialize an empty list to hold all lookml measures.
+    lookml_measures = []
 
-            if hasattr(column.meta, 'looker_measures'):
-                # For each measure found in the combined dictionary, create a lookml_measure.
-                for measure in column.meta.looker_measures:
-                    # Call the lookml_measure function and append the result to the list.
-                    lookml_measures.append(lookml_measure(column, measure, table_format_sql, model))
+    for column in buckets.measures:
+        if hasattr(column.meta, 'looker_measures'):
+            # For each measure found in the combined dictionary, create a lookml_measure.
+            for measure in column.meta.looker_measures:
+                # Call the lookml_measure function and append the result to the list.
+                lookml_measures.append(lookml_measure(column, measure, buckets.table_format_sql, model))
 
     # Return the list of lookml measures.
     return lookml_measures
@@ -394,7 +418,7 @@ def lookml_measure(column: models.DbtModelColumn, measure: models.DbtMetaMeasure
     if measure.description != None:
         m['description'] = measure.description
 
-    logging.debug(f"measure created: {m}" )
+    logging.debug('measure created: %s', m)
     return m
 
 
@@ -402,178 +426,183 @@ def extract_array_models(columns: list[models.DbtModelColumn])->list[models.DbtM
     ''' Process columns to determine if they are nested 
         and if so, what the parent group is
     '''
-    array_list = []
-
-    # Initialize parent_list with all columns that are arrays
-    for column in columns:
-        if column.data_type is not None:
-            if 'ARRAY' == column.data_type:
-                array_list.append(column)
-    return array_list
+    # all columns that are arrays, None never equals 'ARRAY' so untyped columns drop out
+    return [column for column in columns if column.data_type == 'ARRAY']
 
 
 
 def group_strings(all_columns:list[models.DbtModelColumn], array_columns:list[models.DbtModelColumn]):
     nested_columns = {}
 
-    def remove_parts(input_string):
-        parts = input_string.split('.')
-        modified_parts = parts[:-1]
-        result = '.'.join(modified_parts)
-        return result
-    
-    def recurse(parent: models.DbtModelColumn, all_columns:list[models.DbtModelColumn], level = 0):
-        structure = {
-            'column' : parent,
+    # every column is compared against its parent at each level of nesting,
+    # so work out each column's parent path once up front
+    parent_names = {column.name: column.name.rpartition('.')[0] for column in all_columns}
+
+    def build_structure(root: models.DbtModelColumn, all_columns:list[models.DbtModelColumn]):
+        # walk the nesting with a stack rather than recursion, each child's
+        # structure is added to its parent straight away and filled in when popped
+        root_structure = {
+            'column' : root,
             'children' : []
         }
+        stack = [(root_structure, all_columns, 0)]
+
+        while stack:
+            structure, candidates, level = stack.pop()
+            parent_name = structure['column'].name
+            children = structure['children']
+
+            logging.debug('level %d, %s', level, parent_name)
+            for column in candidates:
+                name = column.name
+                # singleton array handling
+                if name == parent_name:
+                    inner_types = column.inner_types
+                    if inner_types is not None:
+                        if len(inner_types) == 1:
+                            logging.debug('column %s is a array child of %s', name, parent_name)
+                            children.append({name : {'column' : column, 'children' : []}})
+                    continue
 
-        logging.debug(f"level {level}, {parent.name}")
-        for column in all_columns:
-            # singleton array handling
-            if column.name == parent.name:
-                if column.inner_types is not None:
-                    if len(column.inner_types) == 1:
-                        logging.debug(f"column {column.name} is a array child of {parent.name}")
-                        structure['children'].append({column.name : {'column' : column, 'children' : []}})
-
-            # descendant handling
-            elif remove_parts(column.name) == parent.name:
-                logging.debug(f"column {column.name} is a direct descendant of {parent.name}")
-
-                structure['children'].append({column.name : recurse(
-                            parent = column,
-                            all_columns = [d for d in all_columns if d.name.startswith(column.name)],
-                            level=level+1)})                
-
-            elif column.name.startswith(parent.name):
-                logging.debug(f"column {column.name} is a nested child of {parent.name}")
+                # descendant handling
+                if parent_names[name] == parent_name:
+                    logging.debug('column %s is a direct descendant of %s', name, parent_name)
+                elif name.startswith(parent_name):
+                    logging.debug('column %s is a nested child of %s', name, parent_name)
+                else:
+                    continue
 
-                structure['children'].append({column.name : recurse(
-                            parent = column,
-                            all_columns = [d for d in all_columns if d.name.startswith(column.name)],
-                            level=level+1)})                
+                child_structure = {
+                    'column' : column,
+                    'children' : []
+                }
+                children.append({name : child_structure})
+                stack.append((child_structure, [d for d in candidates if d.name.startswith(name)], level + 1))
 
-        return structure
+        return root_structure
 
     for parent in array_columns:
         # start with the top level arrays
         if not '.' in parent.name:
-            nested_columns[parent.name] = recurse(parent, all_columns)
+            nested_columns[parent.name] = build_structure(parent, all_columns)
 
     return nested_columns
 
 
-def lookml_view_from_dbt_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters):
-    ''' Create a looker view from a dbt model 
-        if the model has nested arrays, create a view for each array
-        and an explore that joins them together
-    '''
-    array_models = extract_array_models(model.columns.values())
-    structure = group_strings(model.columns.values(), array_models)
-    lookml = {}
-    lookml_list = []
-
+def lookml_view_label(model: models.DbtModel):
+    ''' The label of a model's view, taken from meta.looker.label or the model name '''
     view_label = None
     # Add 'label' only if it exists
     if hasattr(model.meta.looker, 'label'):
         if model.meta.looker.label is not None:
             view_label = model.meta.looker.label
         elif hasattr(model, 'name'):
-            view_label = model.name.replace("_", " ").title()
+            view_label = to_label(model.name)
     elif hasattr(model, 'name'):
-                view_label = model.name.replace("_", " ").title()
+        view_label = to_label(model.name)
 
     if view_label is None:
         logging.warn(f"This model has no name: {model.name}")
+    return view_label
 
-    def recurse_views(structure, d):
-        view_list = []
-        used_names = []
-
-        for parent, children in structure.items():
-            children_names = []
-
-            for child_strucure in children['children']:
-                for child_name, child_dict in child_strucure.items():
-                    children_names.append(child_name)
-                    if len((child_dict['children'])) > 0:
-                        recursed_view_list, recursed_names = recurse_views(child_strucure, d=d+1)
-                        view_list.extend(recursed_view_list)
-                        used_names.extend(recursed_names)
-            logging.debug(f"adding view for {parent} d {d}")
-            view_list.append(
-                {
-                    'name': model.name + "__" + parent.replace('.','__') ,
-                    'label': view_label + " : " + parent.replace("_", " ").title(),
-                    'dimensions': lookml_dimensions_from_model(model, adapter_type, include_names=children_names),
-                    'dimension_groups': lookml_dimension_groups_from_model(model, adapter_type, include_names=children_names).get('dimension_groups'),
-                    'sets' : lookml_dimension_groups_from_model(model, adapter_type, include_names=children_names).get('dimension_group_sets'),
-                    'measures': lookml_measures_from_model(model, adapter_type, include_names=children_names),
-                }
-            )
-            used_names.extend(children_names)
-        return view_list, used_names
+def lookml_array_views(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, view_label: str, structure: dict, d: int):
+    ''' Create a view for each array in the structure built by group_strings '''
+    view_list = []
+    used_names = []
+
+    for parent, children in structure.items():
+        children_names = []
+
+        for child_strucure in children['children']:
+            for child_name, child_dict in child_strucure.items():
+                children_names.append(child_name)
+                if len((child_dict['children'])) > 0:
+                    recursed_view_list, recursed_names = lookml_array_views(model, adapter_type, view_label, child_strucure, d=d+1)
+                    view_list.extend(recursed_view_list)
+                    used_names.extend(recursed_names)
+        logging.debug('adding view for %s d %s', parent, d)
+        buckets = bucket_columns(model, adapter_type, include_names=set(children_names))
+        dimensions = lookml_dimensions_from_model(model, adapter_type, buckets=buckets)
+        dimension_groups = lookml_dimension_groups_from_model(model, adapter_type, buckets=buckets)
+        view_list.append(
+            {
+                'name': model.name + "__" + parent.replace('.','__') ,
+                'label': view_label + " : " + to_label(parent),
+                'dimensions': dimensions,
+                'dimension_groups': dimension_groups.get('dimension_groups'),
+                'sets' : dimension_groups.get('dimension_group_sets'),
+                'measures': lookml_measures_from_model(model, adapter_type, buckets=buckets),
+            }
+        )
+        used_names.extend(children_names)
+    return view_list, used_names
+
+def rael(input_string):
+    ''' replace all but the last period with a replacement string 
+        this is used to create unique names for joins
+    '''
+    # only the part before the last period needs replacing
+    last_period = input_string.rfind('.')
+    if last_period < 0:
+        return input_string
+    return input_string[:last_period].replace('.', '__') + input_string[last_period:]
+
+def lookml_array_joins(model_name: str, structure: dict):
+    ''' Create an UNNEST join for each array in the structure built by group_strings '''
+    join_list = []
+    for parent, children in structure.items():
+        for child_strucure in children['children']:
+            for child_name, child_dict in child_strucure.items():
+                if len((child_dict['children'])) > 0:
+                    recursed_join_list = lookml_array_joins(model_name, child_strucure)
+                    join_list.extend(recursed_join_list)
+        join_list.append(
+            {
+                'sql' : f'LEFT JOIN UNNEST(${{{rael(model_name+"."+parent)}}}) AS {model_name}__{parent.replace(".","__")}',
+                'relationship': 'one_to_many',
+                'name': model_name + "__" + parent.replace('.','__'),
+            }
+        )
+    return join_list
+
+
+def lookml_view_from_dbt_model(model: models.DbtModel, adapter_type: models.SupportedDbtAdapters, strict: bool = False):
+    ''' Create a looker view from a dbt model 
+        if the model has nested arrays, create a view for each array
+        and an explore that joins them together
+        strict serializes with lkml.dump instead of the faster lkml_fast.dump
+    '''
+    array_models = extract_array_models(model.columns.values())
+    structure = group_strings(model.columns.values(), array_models)
+    lookml = {}
+    lookml_list = []
+
+    view_label = lookml_view_label(model)
 
     # this is for handling arrays
     used_names = []
     if structure:
-        view_list, used_names = recurse_views(structure, 1)
+        view_list, used_names = lookml_array_views(model, adapter_type, view_label, structure, 1)
         logging.debug(view_list)
         lookml_list.append(view_list)
 
+    buckets = bucket_columns(model, adapter_type, exclude_names=set(used_names))
+    dimensions = lookml_dimensions_from_model(model, adapter_type, buckets=buckets)
+    dimension_groups = lookml_dimension_groups_from_model(model, adapter_type, buckets=buckets)
     lookml_view = [
         {
             'name': model.name,
             'label': view_label,
             'sql_table_name': model.relation_name,
-            'dimensions': lookml_dimensions_from_model(model, adapter_type, exclude_names=used_names),
-            'dimension_groups': lookml_dimension_groups_from_model(model, adapter_type, exclude_names=used_names).get('dimension_groups'),
-            'sets' : lookml_dimension_groups_from_model(model, adapter_type, exclude_names=used_names).get('dimension_group_sets'),
-            'measures': lookml_measures_from_model(model, adapter_type, exclude_names=used_names),
+            'dimensions': dimensions,
+            'dimension_groups': dimension_groups.get('dimension_groups'),
+            'sets' : dimension_groups.get('dimension_group_sets'),
+            'measures': lookml_measures_from_model(model, adapter_type, buckets=buckets),
         }
     ]
 
     lookml_list.append(lookml_view)
 
-    def rael(input_string):
-        ''' replace all but the last period with a replacement string 
-            this is used to create unique names for joins
-        '''
-        sign = '.'
-        replacement = '__'
-        
-        # Splitting input_string into parts separated by sign (period)
-        parts = input_string.split(sign)
-        
-        # If there's more than one part, we need to do replacements.
-        if len(parts) > 1:
-            # Joining all parts except for last with replacement,
-            # and then adding back on final part.
-            output_string = replacement.join(parts[:-1]) + sign + parts[-1]
-            
-            return output_string
-        
-        # If there are no signs at all or just one part,
-        return input_string
-
-    def recurse_joins(structure, parent_name):
-        join_list = []
-        for parent, children in structure.items():
-            for child_strucure in children['children']:
-                for child_name, child_dict in child_strucure.items():
-                    if len((child_dict['children'])) > 0:
-                        recursed_join_list = recurse_joins(child_strucure, child_name)
-                        join_list.extend(recursed_join_list)
-            join_list.append(
-                {
-                    'sql' : f'LEFT JOIN UNNEST(${{{rael(model.name+"."+parent)}}}) AS {model.name}__{parent.replace(".","__")}',
-                    'relationship': 'one_to_many',
-                    'name': model.name + "__" + parent.replace('.','__'),
-                }
-            )
-        return join_list
-
     if len(array_models) > 0:
         
         lookml_explore = [
@@ -583,7 +612,7 @@ def lookml_view_from_dbt_model(model: models.DbtModel, adapter_type: models.Supp
             'hidden': 'yes'
         }
         ]
-        lookml_explore[0]['joins'].extend(recurse_joins(structure, model.name))
+        lookml_explore[0]['joins'].extend(lookml_array_joins(model.name, structure))
         lookml = {
             'explore': lookml_explore,
             'view': lookml_list,
@@ -594,7 +623,7 @@ def lookml_view_from_dbt_model(model: models.DbtModel, adapter_type: models.Supp
         }
 
     try: 
-        contents = lkml.dump(lookml)
+        contents = lkml.dump(lookml) if strict else lkml_fast.dump(lookml)
         model_failed = False
     except TypeError as e:
         logging.error(f"Error in this model: {model.name} TYPEERROR when dumping lookml: {e}")
@@ -0,0 +1,127 @@
+''' A fast serializer for the lookml dictionaries built by the generator
+
+    lkml.dump builds a full parse tree before turning it into text. The views
+    we generate only contain blocks, pairs and flat lists, so they can be
+    written out directly. The output matches lkml.dump for those shapes.
+
+    Keys that lkml writes differently depending on their context (filters,
+    allowed_value and the children of query) are not supported and raise a
+    TypeError, serialize those with lkml.dump instead.
+'''
+import io
+from lkml.keys import EXPR_BLOCK_KEYS, KEYS_WITH_NAME_FIELDS, PLURAL_KEYS, QUOTED_LITERAL_KEYS, singularize
+
+_INDENT = '  '
+_EXPR_BLOCK_KEYS = frozenset(EXPR_BLOCK_KEYS)
+_KEYS_WITH_NAME_FIELDS = frozenset(KEYS_WITH_NAME_FIELDS)
+_PLURAL_KEYS = frozenset(PLURAL_KEYS)
+_QUOTED_LITERAL_KEYS = frozenset(QUOTED_LITERAL_KEYS)
+# lkml picks the syntax of these from their values or parent key
+_CONTEXT_KEYS = frozenset(('filters', 'allowed_value', 'allowed_values', 'query'))
+
+# What was last written at the current level, which decides the whitespace
+# before the next field. None means we are at the start of a block.
+_DOCUMENT = 'document'
+_BLOCK = 'block'
+_PAIR = 'pair'
+_LIST = 'list'
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('\\"', '"').replace('"', '\\"') + '"'
+
+def _format_value(key: str, value: str) -> str:
+    if key in _QUOTED_LITERAL_KEYS:
+        return _quote(value)
+    elif key in _EXPR_BLOCK_KEYS:
+        return value.strip() + ' ;;'
+    return value
+
+
+class _Writer:
+    def __init__(self):
+        self.out = io.StringIO()
+        self.level = 0
+        self.latest = _DOCUMENT
+
+    @property
+    def newline_indent(self) -> str:
+        return '\n' + _INDENT * self.level
+
+    @property
+    def prefix(self) -> str:
+        if self.latest == _DOCUMENT:
+            return ''
+        elif self.latest == _BLOCK:
+            return '\n' + self.newline_indent
+        return self.newline_indent
+
+    def write_any(self, key: str, value):
+        if key in _CONTEXT_KEYS:
+            raise TypeError(f'The key "{key}" depends on its context, serialize it with lkml.dump.')
+        if isinstance(value, str):
+            self.write_pair(key, value)
+        elif isinstance(value, (list, tuple)):
+            singular_key = singularize(key)
+            if singular_key in _PLURAL_KEYS:
+                for item in value:
+                    self.write_any(singular_key, item)
+            else:
+                self.write_list(key, value)
+        elif isinstance(value, dict):
+            if key in _KEYS_WITH_NAME_FIELDS or 'name' not in value:
+                self.write_block(key, value, None)
+            else:
+                self.write_block(key, {k: v for k, v in value.items() if k != 'name'}, value['name'])
+        else:
+            raise TypeError('Value must be a string, list, tuple, or dict.')
+
+    def write_pair(self, key: str, value: str):
+        self.out.write(f'{self.prefix}{key}: {_format_value(key, value)}')
+        self.latest = _PAIR
+
+    def write_list(self, key: str, values):
+        # lkml writes lists of dicts as pairs, which the generator never produces
+        for value in values:
+            if not isinstance(value, str):
+                raise TypeError('List values must be strings.')
+        write = self.out.write
+        write(f'{self.prefix}{key}: [')
+        # suggestions are only quoted when given as a list
+        format_item = _quote if key == 'suggestions' else lambda value: _format_value(key, value)
+        if len(values) >= 5:
+            self.level += 1
+            item_prefix = self.newline_indent
+            self.level -= 1
+            for value in values:
+                write(f'{item_prefix}{format_item(value)},')
+            write(f'{self.newline_indent}]')
+        else:
+            write(', '.join(format_item(value) for value in values))
+            write(']')
+        self.latest = _LIST
+
+    def write_block(self, key: str, items: dict, name):
+        if self.latest is not None and self.latest != _DOCUMENT:
+            prefix = '\n' + self.newline_indent
+        else:
+            prefix = self.prefix
+        self.out.write(f'{prefix}{key}: {name} {{' if name else f'{prefix}{key}: {{')
+
+        start = self.out.tell()
+        self.level += 1
+        self.latest = None
+        for child_key, child_value in items.items():
+            self.write_any(child_key, child_value)
+        self.level -= 1
+
+        self.out.write(f'{self.newline_indent}}}' if self.out.tell() > start else '}')
+        self.latest = _BLOCK
+
+
+def dump(lookml: dict) -> str:
+    ''' Serialize a generated lookml dictionary, like lkml.dump does '''
+    writer = _Writer()
+    for key, value in lookml.items():
+        writer.write_any(key, value)
+    return writer.out.getvalue()
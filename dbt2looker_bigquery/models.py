@@ -1,14 +1,33 @@
 from enum import Enum
-from typing import Union, Dict, List, Optional
+from typing import Union, Dict, List, Optional, Tuple
 import logging
+import sys
 try:
     from typing import Literal
 except ImportError:
     from typing_extensions import Literal
 from pydantic import BaseModel, Field, validator, root_validator
-import re
 from . import looker_enums
 
+def parse_bq_type(type: str) -> Tuple[str, List[str]]:
+    ''' Split a bigquery type into the part before the first <, and the comma
+        separated contents of each <...> group, e.g. ARRAY<INT64> gives ('ARRAY', ['INT64']).
+        A group runs from a < to the next >, so nested types are not balanced.
+        The parts are interned, as a catalog repeats a handful of types on every column.
+    '''
+    start = type.find('<')
+    if start < 0:
+        return sys.intern(type), []
+    data_type = sys.intern(type[:start])
+    inner_types = []
+    while start >= 0:
+        end = type.find('>', start + 1)
+        if end < 0:
+            break
+        inner_types.extend(sys.intern(x.strip()) for x in type[start + 1:end].split(','))
+        start = type.find('<', end + 1)
+    return data_type, inner_types
+
 def yes_no_validator(value: Union[bool, str]):
     ''' Convert booleans or strings to lookml yes/no syntax'''
     if isinstance(value, bool):
@@ -56,43 +75,42 @@ class DbtCatalogNodeMetadata(BaseModel):
     comment: Optional[str]
     owner: Optional[str]
 
-class DbtCatalogNodeColumn(BaseModel):
-    ''' A column in a dbt catalog node '''
-    type: str
-    data_type: Optional[str] = 'MISSING'
-    inner_types: Optional[list[str]]=[]
-    comment: Optional[str]
-    index: int
-    name: str
-    # child_name: Optional[str]
-    # parent: Optional[str]  # Added field to store the parent node
-    
-    @root_validator(pre=True)
-    def validate_inner_type(cls, values):
-        type = values.get('type')
-        # Check if there is a non-None 'parent' and validate it.
-        pattern = re.compile(r'<(.*?)>')
-        matches = pattern.findall(type)
-
-        def truncate_before_character(string, character):
-            # Find the position of the character in the string.
-            pos = string.find(character)
-            
-            # If found, return everything up to that point.
-            if pos != -1:
-                return string[:pos]
-            
-            # If not found, return the original string.
-            return string
-
-
-        values['data_type'] = truncate_before_character(type, '<')
-        values['inner_types'] = [item.strip() for match in matches for item in match.split(',')]
-        if len(matches) > 0:
-            logging.debug(f"Found inner types {values['inner_types']} in type {type}")
-        return values
-
-
+class DbtCatalogNodeColumn:
+    ''' A column in a dbt catalog node
+
+        This is a plain class rather than a pydantic model, as catalogs can hold
+        tens of thousands of columns and per-field validation dominates parsing.
+        Pydantic still validates the node containing the columns.
+    '''
+    __slots__ = ('type', 'index', 'name', 'comment', 'data_type', 'inner_types')
+
+    def __init__(self, type: str, index: int, name: str, comment: Optional[str] = None, **kwargs):
+        # a TypeError here is reported by pydantic as a ValidationError
+        if not isinstance(type, str):
+            raise TypeError(f'Expected a string catalog column type, got {type!r}')
+        self.type = type
+        self.index = index
+        self.name = name
+        self.comment = comment
+
+        self.data_type, self.inner_types = parse_bq_type(type)
+        if self.inner_types:
+            logging.debug('Found inner types %s in type %s', self.inner_types, type)
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value):
+        if isinstance(value, cls):
+            return value
+        if not isinstance(value, dict):
+            raise TypeError(f'Expected a catalog column, got {value!r}')
+        return cls(**value)
+
+    def __repr__(self):
+        return f'DbtCatalogNodeColumn(name={self.name!r}, type={self.type!r})'
 
 class DbtCatalogNodeRelationship(BaseModel):
     ''' A model for nodes containing relationships '''
@@ -107,10 +125,11 @@ class DbtCatalogNode(BaseModel):
 
     @validator('columns')
     def case_insensitive_column_names(cls, v: Dict[str, DbtCatalogNodeColumn]):
-        return {
-            name.lower(): column.copy(update={'name': column.name.lower()})
-            for name, column in v.items()
-        }
+        new_columns = {}
+        for name, column in v.items():
+            column.name = column.name.lower()
+            new_columns[name.lower()] = column
+        return new_columns
 
 class DbtCatalog(BaseModel):
     ''' A dbt catalog '''
@@ -157,7 +176,7 @@ class DbtMetaMeasure(DbtMetaLooker):
 class DbtModelColumnMeta(BaseModel):
     ''' Metadata about a column in a dbt model '''
     looker: Optional[DbtMetaLooker] = DbtMetaLooker() 
-    looker_measures: Optional[List[DbtMetaMeasure]] = []
+    looker_measures: Optional[List[DbtMetaMeasure]] = Field(default_factory=list)
 
 class DbtModelColumn(BaseModel):
     ''' A column in a dbt model '''
@@ -180,7 +199,7 @@ class DbtModelColumn(BaseModel):
             values['nested'] = True
         values['name'] = name.lower()
         values['lookml_long_name'] = name.replace('.', '__').lower()
-        values['lookml_name'] = name.split('.')[-1].lower()
+        values['lookml_name'] = name.rpartition('.')[2].lower()
         values['description'] = values.get('description', "This field is missing a description.")
         # If the field is an array, it's a nested field
         return values
@@ -219,7 +238,8 @@ class DbtModel(DbtNode):
                 if not isinstance(column, DbtModelColumn):
                     raise TypeError(f"The value for key {name} is not a DbtModelColumn instance.")
                 # Lowercase the name and update the column name
-                new_columns[name.lower()] = column.copy(update={'name': column.name.lower()})
+                column.name = column.name.lower()
+                new_columns[name.lower()] = column
         return new_columns
 
 class DbtManifestMetadata(BaseModel):
@@ -1,16 +1,25 @@
 import logging
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Set
 from . import models as models
-from rich import print
 
 def parse_catalog_nodes(raw_catalog: dict):
     catalog = models.DbtCatalog(**raw_catalog)
     return catalog.nodes
 
 def parse_adapter_type(raw_manifest: dict):
-    manifest = models.DbtManifest(**raw_manifest)
-    return manifest.metadata.adapter_type
+    metadata = models.DbtManifestMetadata(**raw_manifest['metadata'])
+    return metadata.adapter_type
  
+def raw_node_filter(tag: Optional[str] = None, select_model: Optional[str] = None) -> Callable[[dict], bool]:
+    '''Build a check of raw manifest nodes against the model filters, before they are parsed
+        The filters are resolved once here, so checking each node only tests what was given
+    '''
+    if select_model is not None:
+        return lambda raw_node: raw_node.get('resource_type') == 'model' and raw_node.get('name') == select_model
+    if tag is not None:
+        return lambda raw_node: raw_node.get('resource_type') == 'model' and tag in (raw_node.get('tags') or ())
+    return lambda raw_node: raw_node.get('resource_type') == 'model'
+
 def tags_match(query_tag: str, model: models.DbtModel) -> bool:
     try:
         return query_tag in model.tags
@@ -22,7 +31,14 @@ def tags_match(query_tag: str, model: models.DbtModel) -> bool:
 def parse_models(raw_manifest: dict, tag=None, exposures_only=False, select_model:Optional[str] = None) -> List[models.DbtModel]:
     '''Parse dbt models from manifest and filter by tag if provided'''
 
-    manifest = models.DbtManifest(**raw_manifest)
+    # only validate the nodes that can survive the filters below
+    node_matches = raw_node_filter(tag=tag, select_model=select_model)
+    raw_nodes = {
+        unique_id: raw_node
+        for unique_id, raw_node in raw_manifest['nodes'].items()
+        if node_matches(raw_node)
+    }
+    manifest = models.DbtManifest(**{**raw_manifest, 'nodes': raw_nodes})
 
     for node in manifest.nodes.values():
         if node.resource_type == 'model':
@@ -40,7 +56,7 @@ def parse_models(raw_manifest: dict, tag=None, exposures_only=False, select_mode
             for node in manifest.exposures.values()
             if node.resource_type == 'exposure' and hasattr(node, 'name')
         ]
-        exposed_model_names: List[str] = get_exposed_models(all_exposures)
+        exposed_model_names: Set[str] = set(get_exposed_models(all_exposures))
 
     for model in all_models:
         if not hasattr(model, 'name'):
@@ -64,34 +80,28 @@ def parse_models(raw_manifest: dict, tag=None, exposures_only=False, select_mode
 
 def check_models_for_missing_column_types(dbt_typed_models: List[models.DbtModel]):
     for model in dbt_typed_models:
-        if all([col.data_type is None for col in model.columns.values()]):
+        if all(col.data_type is None for col in model.columns.values()):
             logging.debug('Model %s has no typed columns, no dimensions will be generated. %s', model.unique_id, model)
 
 def check_model_materialization(dbt_models: List[models.DbtModel], catalog_nodes : dict, adapter_type: str):
     logging.debug('Found manifest entries for %d models', len(dbt_models))
+    # counting measures walks every column, so only do it when it will be logged
+    log_measures = logging.getLogger().isEnabledFor(logging.DEBUG)
     for model in dbt_models:
-        logging.debug(
-            'Model %s has %d columns with %d measures',
-            model.name,
-            len(model.columns),
-            sum([len(col.meta.looker_measures) for col in model.columns.values()])
-        )
-        
-        if model.unique_id not in catalog_nodes:
+        if log_measures:
             logging.debug(
-                f'Model {model.unique_id} not found in catalog. No looker view will be generated. '
-                f'Check if model has materialized in {adapter_type} at {model.relation_name}'
+                'Model %s has %d columns with %d measures',
+                model.name,
+                len(model.columns),
+                sum(len(col.meta.looker_measures) for col in model.columns.values())
             )
 
-def get_column_type_from_catalog(catalog_nodes: Dict[str, models.DbtCatalogNode], model_id: str, column_name: str):
-    node = catalog_nodes.get(model_id)
-    column = None if node is None else node.columns.get(column_name.lower())
-    return None if column is None else column.data_type
-
-def get_column_inner_type_from_catalog(catalog_nodes: Dict[str, models.DbtCatalogNode], model_id: str, column_name: str):
-    node = catalog_nodes.get(model_id)
-    column = None if node is None else node.columns.get(column_name.lower())
-    return None if column is None else column.inner_types
+        if model.unique_id not in catalog_nodes:
+            logging.debug(
+                'Model %s not found in catalog. No looker view will be generated. '
+                'Check if model has materialized in %s at %s',
+                model.unique_id, adapter_type, model.relation_name
+            )
 
 def get_column_parent_from_catalog(catalog_nodes: Dict[str, models.DbtCatalogNode], model_id: str, column_name: str):
     node = catalog_nodes.get(model_id)
@@ -121,24 +131,27 @@ def parse_typed_models(raw_manifest: dict, raw_catalog: dict, tag: Optional[str]
     check_model_materialization(dbt_models, raw_catalog, adapter_type)
 
     # Update dbt models with data types from catalog
-    dbt_typed_models = [  
-        model.copy(update={'columns': {
-            column.name: column.copy(update={
-                'data_type': get_column_type_from_catalog(catalog_nodes, model.unique_id, column.name),
-                'inner_types': get_column_inner_type_from_catalog(catalog_nodes, model.unique_id, column.name),
-            })
-            for column in model.columns.values()
-        }})
-        for model in dbt_models
-        if model.unique_id in catalog_nodes
-    ]
+    # the parsed models are ours, so update them in place rather than copying every column
+    dbt_typed_models = [model for model in dbt_models if model.unique_id in catalog_nodes]
+    for model in dbt_typed_models:
+        # look the catalog node up once per model, and each catalog column once
+        catalog_columns = catalog_nodes[model.unique_id].columns
+        for column in model.columns.values():
+            catalog_column = catalog_columns.get(column.name.lower())
+            if catalog_column is None:
+                column.data_type = None
+                column.inner_types = None
+            else:
+                column.data_type = catalog_column.data_type
+                column.inner_types = catalog_column.inner_types
+        model.columns = {column.name: column for column in model.columns.values()}
 
     # add catalog only array columns to dbt models
     for model in dbt_typed_models:
         for column in catalog_nodes[model.unique_id].columns.values():
             if column.name not in model.columns:
                 if column.type[0:5] == 'ARRAY':
-                    logging.debug(column.name + " is an array column")
+                    logging.debug('%s is an array column', column.name)
                     new_column = models.DbtModelColumn(
                         name=column.name,
                         description="missing column from manifest.json, generated from catalog.json",
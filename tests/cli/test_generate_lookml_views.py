@@ -0,0 +1,93 @@
+import concurrent.futures
+import os
+import stat
+import pytest
+from dbt2looker_bigquery import cli, models, parser
+
+COLUMNS = [('id', 'INT64'), ('labels', 'ARRAY<STRING>')]
+
+@pytest.fixture
+def typed_models(dbt_project):
+    ''' Builds typed models with an id and an ARRAY<STRING> column each '''
+    def build(model_names):
+        return parser.parse_typed_models(*dbt_project({name: COLUMNS for name in model_names}))
+    return build
+
+def test_singleton_array_column_is_unnested(typed_models):
+    dbt_models = typed_models(['orders'])
+    lookml_views = cli.generate_lookml_views(dbt_models, 'bigquery')
+
+    assert len(lookml_views) == 1
+    contents = lookml_views[0].contents
+    assert 'sql: LEFT JOIN UNNEST(${orders.labels}) AS orders__labels ;;' in contents
+    assert 'view: orders__labels {' in contents
+    assert 'dimension: labels {' in contents
+
+def test_single_cpu_generates_without_worker_processes(typed_models, monkeypatch):
+    def no_pool(*args, **kwargs):
+        pytest.fail('a process pool should not be used with a single cpu')
+    monkeypatch.setattr(cli.os, 'cpu_count', lambda: 1)
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', no_pool)
+
+    model_names = [f'orders_{i}' for i in range(cli.PARALLEL_MODEL_THRESHOLD + 1)]
+    dbt_models = typed_models(model_names)
+    lookml_views = cli.generate_lookml_views(dbt_models, 'bigquery')
+
+    assert [view.filename for view in lookml_views] == [f'{name}.view.lkml' for name in model_names]
+
+def test_worker_processes_match_inline_generation(typed_models):
+    model_names = [f'orders_{i}' for i in range(cli.PARALLEL_MODEL_THRESHOLD + 1)]
+    # generation updates the models in place, so each run gets its own
+    pooled = cli.generate_lookml_views(typed_models(model_names), 'bigquery', jobs=2)
+    inline = cli.generate_lookml_views(typed_models(model_names), 'bigquery', jobs=1)
+
+    assert [(view.filename, view.contents) for view in pooled] == [(view.filename, view.contents) for view in inline]
+
+def test_one_job_generates_without_worker_processes(typed_models, monkeypatch):
+    def no_pool(*args, **kwargs):
+        pytest.fail('a process pool should not be used with one job')
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', no_pool)
+
+    model_names = [f'orders_{i}' for i in range(cli.PARALLEL_MODEL_THRESHOLD + 1)]
+    lookml_views = cli.generate_lookml_views(typed_models(model_names), 'bigquery', jobs=1)
+
+    assert len(lookml_views) == len(model_names)
+
+def test_pool_that_cannot_start_falls_back_to_inline(typed_models, monkeypatch, caplog):
+    def broken_pool(*args, **kwargs):
+        raise OSError('no semaphores')
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', broken_pool)
+
+    model_names = [f'orders_{i}' for i in range(cli.PARALLEL_MODEL_THRESHOLD + 1)]
+    lookml_views = cli.generate_lookml_views(typed_models(model_names), 'bigquery', jobs=2)
+
+    assert [view.filename for view in lookml_views] == [f'{name}.view.lkml' for name in model_names]
+    assert 'generating them inline' in caplog.text
+
+def test_write_lookml_file_applies_umask(tmp_path):
+    old_umask = os.umask(0o002)
+    try:
+        path = tmp_path / 'orders.view.lkml'
+        cli.write_lookml_file(str(path), 'view: orders {}')
+    finally:
+        os.umask(old_umask)
+    assert path.read_text() == 'view: orders {}'
+    assert stat.S_IMODE(path.stat().st_mode) == 0o664
+
+def test_views_on_one_path_are_written_once(tmp_path, monkeypatch, caplog):
+    written = []
+    write_lookml_file = cli.write_lookml_file
+    def record_write(path, contents):
+        written.append(path)
+        write_lookml_file(path, contents)
+    monkeypatch.setattr(cli, 'write_lookml_file', record_write)
+    lookml_views = [
+        models.LookViewFile(filename='orders.view.lkml', contents='view: orders_v1 {}', schema='shop_dev'),
+        models.LookViewFile(filename='orders.view.lkml', contents='view: orders_v2 {}', schema='shop'),
+    ]
+    cli.write_lookml_views(lookml_views, str(tmp_path), remove_schema_string='_dev')
+
+    path = tmp_path / 'views' / 'shop' / 'orders.view.lkml'
+    assert written == [str(path)]
+    assert path.read_text() == 'view: orders_v2 {}'
+    assert 'More than one view is written to' in caplog.text
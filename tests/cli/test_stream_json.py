@@ -0,0 +1,54 @@
+import json
+import pytest
+from dbt2looker_bigquery import cli, parser
+
+pytest.importorskip('ijson')
+
+@pytest.fixture
+def target_dir(tmp_path, dbt_project):
+    columns = [('id', 'INT64'), ('amount', 'FLOAT64')]
+    raw_manifest, raw_catalog = dbt_project(
+        {'orders': columns, 'customers': columns, 'scratch': columns},
+        tags_by_model={'orders': ['prod'], 'customers': ['prod'], 'scratch': ['dev']},
+    )
+    # parts of the files that streaming skips or filters out
+    raw_manifest['nodes']['test.shop.not_null_orders_id'] = {'resource_type': 'test', 'name': 'not_null_orders_id', 'unique_id': 'test.shop.not_null_orders_id'}
+    raw_manifest['exposures']['exposure.shop.dashboard'] = {
+        'resource_type': 'exposure',
+        'name': 'dashboard',
+        'unique_id': 'exposure.shop.dashboard',
+        'refs': [{'name': 'orders'}],
+    }
+    raw_catalog.update(metadata={}, sources={})
+    (tmp_path / 'manifest.json').write_text(json.dumps(raw_manifest))
+    (tmp_path / 'catalog.json').write_text(json.dumps(raw_catalog))
+    return tmp_path
+
+@pytest.mark.parametrize('tag, select_model, exposures_only, model_names', [
+    ('prod', None, False, ['orders', 'customers']),
+    (None, 'orders', False, ['orders']),
+    ('prod', None, True, ['orders']),
+    ('missing', None, False, []),
+])
+def test_streamed_files_give_the_same_models(target_dir, tag, select_model, exposures_only, model_names):
+    def typed_models(raw_manifest, raw_catalog):
+        dbt_models = parser.parse_typed_models(raw_manifest, raw_catalog, tag=tag, exposures_only=exposures_only, select_model=select_model)
+        return [model.dict() for model in dbt_models]
+
+    raw_manifest = cli.stream_manifest(str(target_dir / 'manifest.json'), tag=tag, select_model=select_model, exposures=exposures_only)
+    raw_catalog = cli.stream_catalog(str(target_dir / 'catalog.json'), node_ids=set(raw_manifest['nodes']))
+    expected = typed_models(cli.load_json(str(target_dir / 'manifest.json')), cli.load_json(str(target_dir / 'catalog.json')))
+
+    assert [model['name'] for model in expected] == model_names
+    assert typed_models(raw_manifest, raw_catalog) == expected
+
+def test_stream_catalog_keeps_only_requested_nodes(target_dir):
+    raw_catalog = cli.stream_catalog(str(target_dir / 'catalog.json'), node_ids={'model.shop.orders'})
+    assert list(raw_catalog['nodes']) == ['model.shop.orders']
+    assert cli.stream_catalog(str(target_dir / 'catalog.json'))['nodes'].keys() == {'model.shop.orders', 'model.shop.customers', 'model.shop.scratch'}
+
+def test_only_stream_when_filtering():
+    assert not cli.use_streaming()
+    assert cli.use_streaming(tag='prod')
+    assert cli.use_streaming(select_model='orders')
+    assert not cli.use_streaming(select_model='orders', legacy_parser=True)
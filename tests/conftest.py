@@ -0,0 +1,32 @@
+import pytest
+
+def build_dbt_project(columns_by_model: dict, tags_by_model: dict = None):
+    ''' A raw manifest and catalog for bigquery models in the schema shop
+        columns_by_model maps a model name to its [(column name, bigquery type), ...]
+    '''
+    tags_by_model = tags_by_model or {}
+    raw_manifest = {'metadata': {'adapter_type': 'bigquery'}, 'exposures': {}, 'nodes': {}}
+    raw_catalog = {'nodes': {}}
+    for name, columns in columns_by_model.items():
+        model_id = f'model.shop.{name}'
+        raw_manifest['nodes'][model_id] = {
+            'unique_id': model_id,
+            'resource_type': 'model',
+            'relation_name': f'`project`.`shop`.`{name}`',
+            'schema': 'shop',
+            'name': name,
+            'description': name,
+            'columns': {column: {'name': column, 'description': column} for column, _ in columns},
+            'tags': tags_by_model.get(name, []),
+            'meta': {},
+        }
+        raw_catalog['nodes'][model_id] = {
+            'metadata': {'type': 'table', 'schema': 'shop', 'name': name},
+            'columns': {column: {'type': type, 'index': index, 'name': column} for index, (column, type) in enumerate(columns, start=1)},
+        }
+    return raw_manifest, raw_catalog
+
+@pytest.fixture
+def dbt_project():
+    ''' Builds a raw manifest and catalog, see build_dbt_project '''
+    return build_dbt_project
@@ -0,0 +1,68 @@
+import pytest
+from dbt2looker_bigquery import parser
+from dbt2looker_bigquery.generator import bucket_columns, lookml_dimensions_from_model
+
+COLUMNS = [
+    ('id', 'INT64'),
+    ('status', 'STRING'),
+    ('created_at', 'TIMESTAMP'),
+    ('order_date', 'DATE'),
+    ('items', 'ARRAY<STRUCT<sku STRING, shipped_on DATE>>'),
+    ('items.sku', 'STRING'),
+    ('items.shipped_on', 'DATE'),
+    ('labels', 'ARRAY<STRING>'),
+]
+
+@pytest.fixture
+def model(dbt_project):
+    ''' A typed model with scalars, dates, an array of structs and a singleton array '''
+    [model] = parser.parse_typed_models(*dbt_project({'orders': COLUMNS}))
+    return model
+
+def names(columns):
+    return [column.name for column in columns]
+
+def test_main_view_buckets(model):
+    buckets = bucket_columns(model, 'bigquery', exclude_names={'items.sku', 'items.shipped_on', 'labels'})
+
+    assert buckets.table_format_sql
+    assert buckets.primary_key.name == 'id'
+    # nested struct fields are left to the array view, the singleton array keeps its dimension
+    assert [(column.name, looker_type) for column, looker_type in buckets.dimensions] == [
+        ('id', 'number'),
+        ('status', 'string'),
+        ('order_date', 'date'),
+        ('items', 'string'),
+        ('labels', 'string'),
+    ]
+    assert [(column.name, looker_type) for column, looker_type in buckets.dimension_groups] == [
+        ('created_at', 'timestamp'),
+        ('order_date', 'date'),
+    ]
+    assert names(buckets.measures) == ['id', 'status', 'items']
+
+def test_array_view_buckets(model):
+    buckets = bucket_columns(model, 'bigquery', include_names={'items.sku', 'items.shipped_on'})
+
+    assert not buckets.table_format_sql
+    assert buckets.primary_key.name == 'items.sku'
+    assert [(column.name, looker_type) for column, looker_type in buckets.dimensions] == [
+        ('items.sku', 'string'),
+        ('items.shipped_on', 'date'),
+    ]
+    assert [(column.name, looker_type) for column, looker_type in buckets.dimension_groups] == [('items.shipped_on', 'date')]
+    assert names(buckets.measures) == ['items.sku']
+
+def test_array_view_rewrites_singleton_arrays(model):
+    bucket_columns(model, 'bigquery', include_names={'labels'})
+    assert model.columns['labels'].data_type == 'STRING'
+    assert model.columns['items'].data_type == 'ARRAY'
+
+def test_date_columns_get_extra_dimensions(model):
+    buckets = bucket_columns(model, 'bigquery', exclude_names={'items.sku', 'items.shipped_on', 'labels'})
+    dimensions = lookml_dimensions_from_model(model, 'bigquery', buckets=buckets)
+
+    dimension_names = [dimension['name'] for dimension in dimensions]
+    assert dimension_names == ['id', 'status', 'order_date_iso_year', 'order_date_iso_week_of_year', 'items', 'labels']
+    assert dimensions[0]['primary_key'] == 'yes'
+    assert 'primary_key' not in dimensions[1]
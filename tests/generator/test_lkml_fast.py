@@ -0,0 +1,87 @@
+import lkml
+import pytest
+from dbt2looker_bigquery import lkml_fast
+
+VIEW = {
+    'explore': [
+        {
+            'name': 'orders',
+            'joins': [
+                {
+                    'sql': 'LEFT JOIN UNNEST(${orders.items}) AS orders__items',
+                    'relationship': 'one_to_many',
+                    'name': 'orders__items',
+                }
+            ],
+            'hidden': 'yes',
+        }
+    ],
+    'view': [
+        [
+            {
+                'name': 'orders__items',
+                'label': 'Orders : Items',
+                'dimensions': [{'name': 'sku', 'type': 'string', 'sql': 'orders__items.sku', 'description': 'The "sku"'}],
+                'dimension_groups': [],
+                'sets': [],
+                'measures': [],
+            }
+        ],
+        [
+            {
+                'name': 'orders',
+                'label': 'Orders',
+                'sql_table_name': '`project`.`dataset`.`orders`',
+                'dimensions': [
+                    {'name': 'id', 'type': 'number', 'sql': '${TABLE}.id', 'primary_key': 'yes', 'hidden': 'yes'},
+                    {'name': 'items', 'sql': '${TABLE}.items', 'hidden': 'yes', 'tags': ['array']},
+                ],
+                'dimension_groups': [
+                    {'name': 'created', 'type': 'time', 'sql': '${TABLE}.created', 'timeframes': ['raw', 'time', 'date', 'week', 'month']},
+                ],
+                'sets': [{'name': 's_created', 'fields': ['created_raw', 'created_time']}],
+                'measures': [{'name': 'm_count_id', 'type': 'count', 'sql': '${id}'}],
+            }
+        ],
+    ],
+}
+
+def test_dump_matches_lkml():
+    assert lkml_fast.dump(VIEW) == lkml.dump(VIEW)
+
+@pytest.mark.parametrize('dimension', [
+    {'name': 'status', 'tags': []},
+    {'name': 'status', 'tags': ['a', 'b', 'c', 'd']},
+    {'name': 'status', 'tags': ['a', 'b', 'c', 'd', 'e']},
+    {'name': 'status', 'tags': ['a', 'b', 'c', 'd', 'e', 'f', 'g']},
+    {'name': 'status', 'suggestions': ['open', 'closed']},
+    {'name': 'status', 'suggestions': ['open', 'say "closed"', 'a', 'b', 'c']},
+    {'name': 'status', 'description': 'A "quoted" \\"status\\"'},
+    {'name': 'status', 'sql': '  ${TABLE}.status  '},
+    {'name': 'status', 'link': {'label': 'Docs', 'url': 'https://example.com'}},
+    {'name': 'status', 'link': {}},
+])
+def test_dump_matches_lkml_for_dimension(dimension):
+    lookml = {'view': [{'name': 'orders', 'dimensions': [dimension]}]}
+    assert lkml_fast.dump(lookml) == lkml.dump(lookml)
+
+@pytest.mark.parametrize('value', [
+    2,
+    None,
+    ['a', 1],
+    [['a']],
+    [{'a': 'b'}],
+    [{'a': 'b'}, {'c': 'd'}, {'e': 'f'}, {'g': 'h'}, {'i': 'j'}],
+])
+def test_dump_rejects_unsupported_values(value):
+    with pytest.raises(TypeError):
+        lkml_fast.dump({'view': [{'name': 'orders', 'precision': value}]})
+
+@pytest.mark.parametrize('lookml', [
+    {'view': [{'name': 'orders', 'measures': [{'name': 'n', 'filters': [{'field': 'status', 'value': 'open'}]}]}]},
+    {'view': [{'name': 'orders', 'parameters': [{'name': 'p', 'allowed_values': [{'label': 'Open', 'value': 'open'}]}]}]},
+    {'explore': [{'name': 'orders', 'aggregate_tables': [{'name': 'a', 'query': {'dimensions': ['status']}}]}]},
+])
+def test_dump_rejects_context_dependent_keys(lookml):
+    with pytest.raises(TypeError):
+        lkml_fast.dump(lookml)
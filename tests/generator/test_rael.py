@@ -0,0 +1,13 @@
+import pytest
+from dbt2looker_bigquery.generator import rael
+
+@pytest.mark.parametrize('input_string, expected_output', [
+    ('model', 'model'),
+    ('model.column', 'model.column'),
+    ('model.parent.column', 'model__parent.column'),
+    ('model.a.b.column', 'model__a__b.column'),
+    ('.column', '.column'),
+    ('model.', 'model.'),
+])
+def test_rael_replaces_all_but_last_period(input_string, expected_output):
+    assert rael(input_string) == expected_output
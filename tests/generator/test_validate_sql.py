@@ -0,0 +1,19 @@
+import pytest
+from dbt2looker_bigquery.generator import validate_sql
+
+@pytest.mark.parametrize('sql, expected_output', [
+    ('${TABLE}.amount', '${TABLE}.amount'),
+    ('${orders.amount} * 2', '${orders.amount} * 2'),
+    ('${x}', '${x}'),
+    ('${TABLE}.amount;;', '${TABLE}.amount'),
+    ('  ${TABLE}.amount ;;  ', '${TABLE}.amount '),
+    ('${TABLE}.amount;;;', '${TABLE}.amount'),
+    # a single semicolon is left for lkml to report
+    ('${TABLE}.amount;', '${TABLE}.amount;'),
+    ('sum(amount)', None),
+    ('${TABLE', None),
+    # the closing brace has to come after ${
+    ('}${a', None),
+])
+def test_validate_sql(sql, expected_output):
+    assert validate_sql(sql) == expected_output
@@ -0,0 +1,23 @@
+import pytest
+from pydantic import ValidationError
+from dbt2looker_bigquery.models import DbtCatalog
+
+def catalog(columns):
+    return {'nodes': {'model.shop.orders': {
+        'metadata': {'type': 'table', 'schema': 'shop', 'name': 'orders'},
+        'columns': columns,
+    }}}
+
+def test_catalog_columns_are_parsed():
+    raw_catalog = catalog({'ID': {'type': 'ARRAY<INT64>', 'index': 1, 'name': 'ID', 'comment': None}})
+    column = DbtCatalog(**raw_catalog).nodes['model.shop.orders'].columns['id']
+    assert (column.data_type, column.inner_types) == ('ARRAY', ['INT64'])
+
+@pytest.mark.parametrize('column', [
+    {'type': None, 'index': 1, 'name': 'id'},
+    {'index': 1, 'name': 'id'},
+    'INT64',
+])
+def test_invalid_catalog_columns_fail_validation(column):
+    with pytest.raises(ValidationError):
+        DbtCatalog(**catalog({'id': column}))
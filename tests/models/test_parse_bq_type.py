@@ -0,0 +1,12 @@
+import pytest
+from dbt2looker_bigquery.models import parse_bq_type
+
+@pytest.mark.parametrize('type, expected', [
+    ('STRING', ('STRING', [])),
+    ('ARRAY<INT64>', ('ARRAY', ['INT64'])),
+    ('STRUCT<a INT64, b STRING>', ('STRUCT', ['a INT64', 'b STRING'])),
+    ('ARRAY<STRUCT<a INT64, b STRING>>', ('ARRAY', ['STRUCT<a INT64', 'b STRING'])),
+    ('ARRAY<', ('ARRAY', [])),
+])
+def test_parse_bq_type(type, expected):
+    assert parse_bq_type(type) == expected
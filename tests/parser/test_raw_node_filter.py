@@ -0,0 +1,28 @@
+from dbt2looker_bigquery.parser import raw_node_filter
+
+def test_raw_node_filter_only_models():
+    node_matches = raw_node_filter()
+    assert node_matches({'resource_type': 'model', 'name': 'orders'})
+    assert not node_matches({'resource_type': 'test', 'name': 'orders'})
+
+def test_raw_node_filter_select_model():
+    node = {'resource_type': 'model', 'name': 'orders', 'tags': []}
+    assert raw_node_filter(select_model='orders')(node)
+    assert not raw_node_filter(select_model='customers')(node)
+    assert not raw_node_filter(select_model='orders')({'resource_type': 'seed', 'name': 'orders'})
+
+def test_raw_node_filter_tag():
+    node = {'resource_type': 'model', 'name': 'orders', 'tags': ['prod']}
+    assert raw_node_filter(tag='prod')(node)
+    assert not raw_node_filter(tag='dev')(node)
+    assert not raw_node_filter(tag='prod')({'resource_type': 'model', 'name': 'orders'})
+
+def test_raw_node_filter_select_model_takes_precedence():
+    node = {'resource_type': 'model', 'name': 'orders', 'tags': ['dev']}
+    assert raw_node_filter(tag='prod', select_model='orders')(node)
+
+def test_raw_node_filter_is_reusable():
+    node_matches = raw_node_filter(tag='prod')
+    assert node_matches({'resource_type': 'model', 'name': 'orders', 'tags': ['prod']})
+    assert not node_matches({'resource_type': 'model', 'name': 'customers', 'tags': ['dev']})
+    assert not node_matches({'resource_type': 'seed', 'name': 'countries', 'tags': ['prod']})